@@ -3,6 +3,8 @@
 # Command sequence class
 #
 #===========================================================================
+import collections
+import logging
 from . import log
 from . import util
 
@@ -21,10 +23,10 @@ class CommandSeq:
     network activity to actually run the command.  In the future, this is
     probably a good case for switching to asyncio type processing.
 
-    Ideally there is a better way to this but I couldn't come up with any.
-    Since each call is via callback, the stack grows longer and longer so
-    this shouldn't be used for 100+ calls but for the small number of calls
-    this library needs, it works ok.
+    Commands that finish synchronously (i.e. call on_done before
+    returning) don't recurse into the next command.  Instead on_done marks
+    the sequence as ready and the loop in _drive() starts the next command.
+    This keeps the stack depth constant no matter how long the sequence is.
     """
     #-----------------------------------------------------------------------
     def __init__(self, device, msg=None, on_done=None, error_stop=True,
@@ -45,12 +47,21 @@ class CommandSeq:
         self._on_done = util.make_callback(on_done)
         self.msg = msg
         self.error_stop = error_stop
+        # Number of commands in the sequence.  Set in run() and only used
+        # for logging.
         self.total = 0
         self.name = name
 
-        # List of Entry objects (see class below) to call for each step in
-        # the sequence.
-        self.calls = []
+        # True when the last command finished and the next one can be
+        # started.  True while _drive() is looping over the commands.
+        self._ready = False
+        self._running = False
+
+        # Queue of (dispatch, payload) tuples to call for each step in the
+        # sequence.  The dispatch function (see the bottom of this file) is
+        # called as dispatch(payload, device, on_done).  Steps are popped
+        # off the front as they run.
+        self.calls = collections.deque()
 
     #-----------------------------------------------------------------------
     def add(self, func, *args, **kwargs):
@@ -70,8 +81,10 @@ class CommandSeq:
         # remote it here to avoid getting a duplicate keyword error later..
         if "on_done" in kwargs:
             del kwargs["on_done"]
-        self.calls.append(Entry.from_func(func, args, kwargs))
-        self.total += 1
+        if kwargs:
+            self.calls.append((_dispatch_func_kw, (func, args, kwargs)))
+        else:
+            self.calls.append((_dispatch_func, (func, args)))
 
     #-----------------------------------------------------------------------
     def add_msg(self, msg, handler):
@@ -88,8 +101,7 @@ class CommandSeq:
           msg:  The message object to send.
           handler:  The handler to use for the message.
         """
-        self.calls.append(Entry.from_msg(msg, handler))
-        self.total += 1
+        self.calls.append((_dispatch_msg, (msg, handler)))
 
     #-----------------------------------------------------------------------
     def run(self):
@@ -99,6 +111,7 @@ class CommandSeq:
         right away.  When the current command finishes, the on_done callback
         to that command triggers the next call.
         """
+        self.total = len(self.calls)
         self.on_done(True, None, None)
 
     #-----------------------------------------------------------------------
@@ -126,79 +139,81 @@ class CommandSeq:
         elif not self.calls:
             self._on_done(success, self.msg, data)
 
-        # Otherwise run the next command.
+        # Otherwise flag that the next command can run.  If this was called
+        # from inside _drive() (the command finished synchronously), the
+        # loop there will pick it up.  Otherwise this is an asynchronous
+        # completion so start the loop here.
         else:
-            LOG.debug("CmdSeq %s Running %d of %d", self.name,
-                      self.total + 1 - len(self.calls), self.total)
+            self._ready = True
+            if not self._running:
+                self._drive()
+
+    #-----------------------------------------------------------------------
+    def _drive(self):
+        """Run commands until one doesn't finish synchronously.
 
-            entry = self.calls.pop(0)
-            entry.run(self.device, self.on_done)
+        Each command is passed on_done as its callback.  If the command
+        finishes before returning, on_done sets the ready flag and this loop
+        runs the next command instead of on_done recursing into it.
+        """
+        self._running = True
+        try:
+            while self._ready and self.calls:
+                self._ready = False
+                if log.is_enabled_for(logging.DEBUG):
+                    LOG.debug("CmdSeq %s Running %d of %d", self.name,
+                              self.total + 1 - len(self.calls), self.total)
+
+                dispatch, payload = self.calls.popleft()
+                dispatch(payload, self.device, self.on_done)
+        finally:
+            self._running = False
 
     #-----------------------------------------------------------------------
 
 
 #===========================================================================
-class Entry:
-    """Command entry to call in the CommandSeq.
-
-    This stores the necessary data to run a command.  It can either be a
-    function to call or a msg+handler to send to the modem.
+def _dispatch_func(payload, device, on_done):
+    """Run a function command with no keyword arguments from the CommandSeq.
+
+    Args:
+      payload:    Tuple of (func, args).  In addition to the input arguments,
+                  func must accept an on_done keyword argument.
+      device:     The Device object the sequence is for.
+      on_done:    The finished calllback to pass to the function.
     """
-    #pylint: disable=attribute-defined-outside-init
-
-    @classmethod
-    def from_func(cls, func, args, kwargs):
-        """Call a function to run the command.
-
-        Args:
-          cls:     Entry class.
-          func:    The function to call.  In addition to the input arguments,
-                   this must accept an on_done command as a keyword argument.
-          args:    The positional arguments to pass to func.
-          kwargs:  The keyword arguments to pass to func.
-
-        Returns:
-          Entry: Returns the contructed Entry object.
-        """
-        obj = cls()
-        obj.msg = None
-        obj.func = func
-        obj.args = args
-        obj.kwargs = kwargs
-        return obj
-
-    #-----------------------------------------------------------------------
-    @classmethod
-    def from_msg(cls, msg, handler):
-        """Send a message w/ handler to run the command.
+    # pylint: disable=unused-argument
+    func, args = payload
+    func(*args, on_done=on_done)
 
-        Args:
-          cls:     Entry class.
-          msg:     The message to send.
-          handler: The message handler to use.
 
-        Returns:
-          Entry: Returns the contructed Entry object.
-        """
-        obj = cls()
-        obj.func = None
-        obj.msg = msg
-        obj.handler = handler
-        return obj
+#===========================================================================
+def _dispatch_func_kw(payload, device, on_done):
+    """Run a function command with keyword arguments from the CommandSeq.
+
+    Args:
+      payload:    Tuple of (func, args, kwargs).  In addition to the input
+                  arguments, func must accept an on_done keyword argument.
+      device:     The Device object the sequence is for.
+      on_done:    The finished calllback to pass to the function.
+    """
+    # pylint: disable=unused-argument
+    func, args, kwargs = payload
+    func(*args, on_done=on_done, **kwargs)
 
-    #-----------------------------------------------------------------------
-    def run(self, device, on_done):
-        """Run the command.
 
-        Args:
-          device:     The Device object to use to send messages.
-          on_done:    The finished calllback.  This will be passed to the
-                      handler or the function.
-        """
-        if self.func is None:
-            self.handler.on_done = on_done
-            device.send(self.msg, self.handler)
+#===========================================================================
+def _dispatch_msg(payload, device, on_done):
+    """Send a message w/ handler command from the CommandSeq.
+
+    Args:
+      payload:    Tuple of (msg, handler) to send.
+      device:     The Device object to use to send messages.
+      on_done:    The finished calllback.  This replaces the handler's
+                  on_done callback.
+    """
+    msg, handler = payload
+    handler.on_done = on_done
+    device.send(msg, handler)
 
-        else:
-            self.func(*self.args, on_done=on_done, **self.kwargs)
 #===========================================================================
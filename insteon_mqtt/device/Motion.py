@@ -64,6 +64,17 @@ class Motion(BatterySensor):
     # Currently set at 4 Days
     BATTERY_TIME = (60 * 60) * 24 * 4
 
+    # All zero extended message payload.  Used as is for the get flags
+    # request and copied and filled in for the set commands.
+    _EXT_TEMPLATE = bytes(14)
+
+    # The operating flags that are set together by update_flags() and the
+    # error message to use if the input value is invalid.
+    _FLAG_INPUTS = (("led_on", "Invalid led on."),
+                    ("night_only", "Invalid night only."),
+                    ("on_only", "Invalid on only."))
+    _FLAG_NAMES = frozenset(name for name, _ in _FLAG_INPUTS)
+
     def __init__(self, protocol, modem, address, name=None, config_extra=None):
         """Constructor
 
@@ -82,7 +93,7 @@ class Motion(BatterySensor):
 
         # Insert the dawn/dusk callback on group 02.  Base class already
         # handles the other groups.
-        self.group_map.update({0x02: self.handle_dawn})
+        self.group_map[0x02] = self.handle_dawn
 
         # Remote (mqtt) commands mapped to methods calls.  Add to the
         # base class defined commands.
@@ -101,6 +112,22 @@ class Motion(BatterySensor):
         # requests.  Otherwise, a request may get queued multiple times
         self._battery_request_time = 0
 
+        # Earliest time that auto_check_battery() could send a request.
+        self._next_battery_check = 0
+
+        # Generic ack callbacks by their on_done text.  See _ack().
+        self._ack_callbacks = {}
+
+        # Cached copy of the 'Motion' db metadata dict and the db it was
+        # read from.  See _meta().
+        self._meta_cache = None
+        self._meta_db = None
+
+        # Cached model number prefix (i.e. "2842") and the db description it
+        # was read from.  See _model_family.
+        self._model_family_cache = None
+        self._model_desc = None
+
         # Define the flags handled by set_flags()
         self.set_flags_map.update({"led_on": self.update_flags,
                                    "night_only": self.update_flags,
@@ -108,17 +135,72 @@ class Motion(BatterySensor):
                                    "timeout": self._set_timeout,
                                    "light_sensitivity": self._set_light_sens})
 
+    #-----------------------------------------------------------------------
+    @property
+    def _model_family(self):
+        """Returns the model number prefix of the device (i.e. "2842" or
+        "2844") or None if the device model isn't known yet.
+
+        The value is cached and only recomputed when the device description
+        in the db changes.
+        """
+        desc = self.db.desc
+        if desc is not self._model_desc:
+            self._model_desc = desc
+            self._model_family_cache = (None if desc is None else
+                                        desc.model.partition("-")[0])
+        return self._model_family_cache
+
+    #-----------------------------------------------------------------------
+    def _ack(self, text):
+        """Returns a generic ack callback with the input on_done text.
+
+        The callbacks are created once per text and reused.
+
+        Args:
+          text (str): The string to output to the on_done callback when on
+                      success
+        """
+        callback = self._ack_callbacks.get(text)
+        if callback is None:
+            callback = self.generic_ack_callback(text)
+            self._ack_callbacks[text] = callback
+        return callback
+
+    #-----------------------------------------------------------------------
+    def _meta(self):
+        """Returns the 'Motion' metadata dict from the device db.
+
+        The dict is looked up once and cached.  The cache is refreshed if
+        the db object is replaced (i.e. when it's loaded from disk).
+        Changes should be made to the returned dict and then saved with
+        _save_meta().
+        """
+        if self._meta_db is not self.db:
+            meta = self.db.get_meta('Motion')
+            self._meta_cache = meta if isinstance(meta, dict) else {}
+            self._meta_db = self.db
+        return self._meta_cache
+
+    #-----------------------------------------------------------------------
+    def _save_meta(self, key, val):
+        """Sets a value in the 'Motion' metadata and saves it to the db.
+
+        Args:
+          key:    (str) The metadata key to set.
+          val:    The value to store.
+        """
+        meta = self._meta()
+        meta[key] = val
+        self.db.set_meta('Motion', meta)
+
     #-----------------------------------------------------------------------
     @property
     def battery_voltage_time(self):
         """Returns the timestamp of the last battery voltage report from the
         saved metadata
         """
-        meta = self.db.get_meta('Motion')
-        ret = 0
-        if isinstance(meta, dict) and 'battery_voltage_time' in meta:
-            ret = meta['battery_voltage_time']
-        return ret
+        return self._meta().get('battery_voltage_time', 0)
 
     #-----------------------------------------------------------------------
     @battery_voltage_time.setter
@@ -128,13 +210,7 @@ class Motion(BatterySensor):
         Args:
           val:    (timestamp) time.time() value
         """
-        meta = {'battery_voltage_time': val}
-        existing = self.db.get_meta('Motion')
-        if isinstance(existing, dict):
-            existing.update(meta)
-            self.db.set_meta('Motion', existing)
-        else:
-            self.db.set_meta('Motion', meta)
+        self._save_meta('battery_voltage_time', val)
 
     #-----------------------------------------------------------------------
     @property
@@ -143,16 +219,13 @@ class Motion(BatterySensor):
         low.  The default value is 7.0 volts for 2842 models and 1.85 for
         2844 models.
         """
-        meta = self.db.get_meta('Motion')
-        if (self.db.desc is not None and
-                self.db.desc.model.split("-")[0] == "2842"):
-            ret = 7.0
-        else:
-            ret = 1.85
+        meta = self._meta()
+        if 'battery_low_voltage' in meta:
+            return meta['battery_low_voltage']
 
-        if isinstance(meta, dict) and 'battery_low_voltage' in meta:
-            ret = meta['battery_low_voltage']
-        return ret
+        if self._model_family == "2842":
+            return 7.0
+        return 1.85
 
     #-----------------------------------------------------------------------
     @battery_low_voltage.setter
@@ -162,13 +235,7 @@ class Motion(BatterySensor):
         Args:
           val:    (float) Low voltage number
         """
-        meta = {'battery_low_voltage': val}
-        existing = self.db.get_meta('Motion')
-        if isinstance(existing, dict):
-            existing.update(meta)
-            self.db.set_meta('Motion', existing)
-        else:
-            self.db.set_meta('Motion', meta)
+        self._save_meta('battery_low_voltage', val)
 
     #-----------------------------------------------------------------------
     def set_low_battery_voltage(self, on_done, voltage=None):
@@ -210,10 +277,15 @@ class Motion(BatterySensor):
     #-----------------------------------------------------------------------
     def update_flags(self, on_done=None, **kwargs):
         """Change the operating flags.
+
+        All three flags are written to the device at once.  If any of them
+        aren't in the inputs, the current flags are read from the device
+        first so that those values aren't changed.
         """
         seq = CommandSeq(self, "Motion Set Flags Success", on_done,
                          name="UpdateFlags")
-        seq.add(self._get_ext_flags)
+        if not Motion._FLAG_NAMES.issubset(kwargs):
+            seq.add(self._get_ext_flags)
         seq.add(self._change_flags, kwargs)
         seq.run()
 
@@ -223,49 +295,32 @@ class Motion(BatterySensor):
 
         See the set_flags() code for details.
         """
-        # Check for valid input
-        if 'led_on' in flags:
-            led_on = util.input_bool(flags, 'led_on')
-            if led_on is None:
-                LOG.error("Invalid led on.")
-                on_done(False, 'Invalid led on.', None)
+        # Check for valid input.  Flags that aren't in the input keep their
+        # current value.
+        values = []
+        for name, error in Motion._FLAG_INPUTS:
+            if name not in flags:
+                values.append(getattr(self, name))
+                continue
+
+            value = util.input_bool(flags, name)
+            if value is None:
+                LOG.error(error)
+                on_done(False, error, None)
                 return
-        else:
-            led_on = self.led_on
-        if 'night_only' in flags:
-            night_only = util.input_bool(flags, 'night_only')
-            if night_only is None:
-                LOG.error("Invalid night only.")
-                on_done(False, 'Invalid night only.', None)
-                return
-        else:
-            night_only = self.night_only
-        if 'on_only' in flags:
-            on_only = util.input_bool(flags, 'on_only')
-            if on_only is None:
-                LOG.error("Invalid on only.")
-                on_done(False, 'Invalid on only.', None)
-                return
-        else:
-            on_only = self.on_only
-
-        # Generate the value of the combined flags.
-        # on_only and night_only are inverted
-        value = 0
-        value = util.bit_set(value, 3, led_on)
-        value = util.bit_set(value, 2, False if night_only else True)
-        value = util.bit_set(value, 1, False if on_only else True)
-
-        # Push the flags value to the device.
-        data = bytes([
-            0x00,   # D1 = 0x00
-            0x05,   # D2 = 0x05 Set Flags
-            value,  # D3 = the flag value
-            ] + [0x00] * 11)
-        msg = Msg.OutExtended.direct(self.addr, 0x2e, 0x00, data)
-        callback = self.generic_ack_callback("Flags updated.")
-        msg_handler = handler.StandardCmd(msg, callback, on_done)
-        self.send(msg, msg_handler)
+            values.append(value)
+
+        led_on, night_only, on_only = values
+
+        # Generate the value of the combined flags.  Bit 3 is led_on, bit 2
+        # is night_only, and bit 1 is on_only.  on_only and night_only are
+        # inverted.
+        value = ((8 if led_on else 0) |
+                 (0 if night_only else 4) |
+                 (0 if on_only else 2))
+
+        # Push the flags value to the device.  D2 = 0x05 Set Flags
+        self._send_ext(0x05, value, "Flags updated.", on_done)
 
     #-----------------------------------------------------------------------
     def _get_ext_flags(self, on_done=None):
@@ -281,9 +336,8 @@ class Motion(BatterySensor):
         LOG.info("Motion %s cmd: get extended operation flags", self.label)
 
         # Requesting data is all 0s. Flags are in D6 of ext response msg
-        data = bytes([0x00] * 14)
-
-        msg = Msg.OutExtended.direct(self.addr, 0x2e, 0x00, data)
+        msg = Msg.OutExtended.direct(self.addr, 0x2e, 0x00,
+                                     Motion._EXT_TEMPLATE)
         msg_handler = handler.ExtendedCmdResponse(msg, self.handle_ext_flags,
                                                   on_done)
         self.send(msg, msg_handler)
@@ -307,17 +361,18 @@ class Motion(BatterySensor):
           on_done:  Finished callback.  This is called when the command has
                     completed.  Signature is: on_done(success, msg, data)
         """
-        LOG.ui("Motion %s extended operating flags: %s", self.addr,
-               "{:08b}".format(msg.data[5]))
-        self.led_on = util.bit_get(msg.data[5], 3)
-        self.night_only = util.bit_get(msg.data[5], 2)
-        self.on_only = util.bit_get(msg.data[5], 1)
+        flags = msg.data[5]
+        if log.is_enabled_for(log.UI_LEVEL):
+            LOG.ui("Motion %s extended operating flags: %s", self.addr,
+                   format(flags, "08b"))
+        self.led_on = util.bit_get(flags, 3)
+        self.night_only = util.bit_get(flags, 2)
+        self.on_only = util.bit_get(flags, 1)
 
         # D11 has the light level, not doing anything with that now.
 
         # D12 voltage
-        if (self.db.desc is not None and
-                self.db.desc.model.split("-")[0] == "2842"):
+        if self._model_family == "2842":
             batt_volt = msg.data[11] / 10
         else:
             # by default assume 2844 model
@@ -325,12 +380,12 @@ class Motion(BatterySensor):
 
         LOG.info("Motion %s battery voltage is %s", self.label,
                  batt_volt)
-        self.battery_voltage_time = time.time()
+        self._save_meta('battery_voltage_time', time.time())
         # Signal low battery
         self.signal_low_battery.emit(self,
                                      batt_volt <= self.battery_low_voltage)
 
-        on_done(True, "Operation complete", msg.data[5])
+        on_done(True, "Operation complete", flags)
 
     #-----------------------------------------------------------------------
     def _set_light_sens(self, on_done=None, **kwargs):
@@ -345,16 +400,10 @@ class Motion(BatterySensor):
             on_done(False, 'Invalid light sensitivity.', None)
             return
 
-        # Push the flags value to the device.
-        data = bytes([
-            0x00,   # D1 = 0x00
-            0x04,   # D2 = 0x05 Set Flags
-            int(sensitivity),  # D3 = the sensitivity value
-            ] + [0x00] * 11)
-        msg = Msg.OutExtended.direct(self.addr, 0x2e, 0x00, data)
-        callback = self.generic_ack_callback("Light sensitivity updated.")
-        msg_handler = handler.StandardCmd(msg, callback, on_done)
-        self.send(msg, msg_handler)
+        # Push the sensitivity value to the device.  D2 = 0x04 Set Light
+        # Sensitivity
+        self._send_ext(0x04, int(sensitivity), "Light sensitivity updated.",
+                       on_done)
 
     #-----------------------------------------------------------------------
     def _set_timeout(self, on_done=None, **kwargs):
@@ -375,8 +424,7 @@ class Motion(BatterySensor):
         # The calculation of the timeout value is stored differently on the
         # older 2842 and the newer 2844 motion sensors.  We will assume the
         # newer style as a default.
-        if (self.db.desc is not None and
-                self.db.desc.model.split("-")[0] == "2842"):
+        if self._model_family == "2842":
             # Minimum of 30 seconds
             if timeout < 30:
                 timeout = 30
@@ -398,15 +446,26 @@ class Motion(BatterySensor):
             LOG.ui("Motion %s setting timeout to %s seconds", self.addr,
                    ((timeout) * 10))
 
-        # Push the flags value to the device.
-        data = bytes([
-            0x00,   # D1 = 0x00
-            0x03,   # D2 = 0x05 Set Flags
-            timeout,  # D3 = the sensitivity value
-            ] + [0x00] * 11)
-        msg = Msg.OutExtended.direct(self.addr, 0x2e, 0x00, data)
-        callback = self.generic_ack_callback("Motion timeout updated.")
-        msg_handler = handler.StandardCmd(msg, callback, on_done)
+        # Push the timeout value to the device.  D2 = 0x03 Set Timeout
+        self._send_ext(0x03, timeout, "Motion timeout updated.", on_done)
+
+    #-----------------------------------------------------------------------
+    def _send_ext(self, d2, d3, text, on_done):
+        """Send an extended set command to the device.
+
+        Args:
+          d2 (int):  The D2 command code (i.e. 0x05 = set flags).
+          d3 (int):  The D3 value to set.
+          text (str):  The on_done message to pass when the device acks the
+               command.
+          on_done: Finished callback.  This is called when the command has
+                   completed.  Signature is: on_done(success, msg, data)
+        """
+        data = bytearray(Motion._EXT_TEMPLATE)
+        data[1] = d2
+        data[2] = d3
+        msg = Msg.OutExtended.direct(self.addr, 0x2e, 0x00, bytes(data))
+        msg_handler = handler.StandardCmd(msg, self._ack(text), on_done)
         self.send(msg, msg_handler)
 
     #-----------------------------------------------------------------------
@@ -415,21 +474,30 @@ class Motion(BatterySensor):
 
         If the device supports it, and the requisite amount of time has
         elapsed, queue a battery request.
+
+        This is called for every message sent while the device is awake so
+        the earliest time a request could be due is cached and checked
+        first.
         """
-        if (self.db.desc is not None and
-                (self.db.desc.model.split("-")[0] == "2842" or
-                 self.db.desc.model.split("-")[0] == "2844")):
+        now = time.time()
+        if now < self._next_battery_check:
+            return
+
+        if self._model_family in ("2842", "2844"):
             # This is a device that supports battery requests
             last_checked = self.battery_voltage_time
             # Don't send this message more than once every 5 minutes no
             # matter what
-            if (last_checked + self.BATTERY_TIME <= time.time() and
-                    self._battery_request_time + 300 <= time.time()):
-                self._battery_request_time = time.time()
+            if (last_checked + self.BATTERY_TIME <= now and
+                    self._battery_request_time + 300 <= now):
+                self._battery_request_time = now
                 LOG.info("Motion %s: Auto requesting battery voltage",
                          self.label)
                 self._get_ext_flags(None)
 
+            self._next_battery_check = max(last_checked + self.BATTERY_TIME,
+                                           self._battery_request_time + 300)
+
     #-----------------------------------------------------------------------
     def awake(self, on_done):
         """Injects a Battery Voltage Request if Necessary
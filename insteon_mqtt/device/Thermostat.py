@@ -14,6 +14,15 @@ from ..Signal import Signal
 
 LOG = log.get_logger()
 
+# Extended message payloads.  These are never modified so they're shared by
+# all the messages that use them.
+_ZERO14 = bytes(14)
+_ENABLE_BCAST_PAYLOAD = bytes([0x00, 0x08]) + bytes(12)
+_HUMID_REQ_PAYLOAD = bytes([0x00, 0x00, 0x01]) + bytes(11)
+
+# Celsius to Farenheit slope so the setpoint conversion is a single multiply.
+_C_TO_F_SLOPE = 9.0 / 5.0
+
 
 class Thermostat(Base):
     """Insteon Thermostat
@@ -85,6 +94,41 @@ class Thermostat(Base):
     FARENHEIT = 0
     CELSIUS = 1
 
+    # Broadcast groups the thermostat sends on.  These are the group_map keys
+    # so Base.pair() links the modem to each of them in this order.
+    _GROUP_VALUES = tuple(member.value for member in Groups)
+
+    # Value to enum member maps for decoding message bytes.  Unknown values
+    # return None from get() instead of raising like the enum constructor.
+    _GROUP_BY_VAL = {member.value: member for member in Groups}
+    _MODE_BY_VAL = {member.value: member for member in Mode}
+    _FAN_BY_VAL = {member.value: member for member in Fan}
+
+    # Broadcast on/off commands and the status they signal for each
+    # (group, cmd1).  Only heating and cooling are handled, not humidifying.
+    _BCAST_CMDS = frozenset((Msg.CmdType.ON, Msg.CmdType.OFF))
+    _BCAST_STATUS = {
+        (Groups.COOLING, Msg.CmdType.ON): Status.COOLING,
+        (Groups.COOLING, Msg.CmdType.OFF): Status.OFF,
+        (Groups.HEATING, Msg.CmdType.ON): Status.HEATING,
+        (Groups.HEATING, Msg.CmdType.OFF): Status.OFF,
+        }
+
+    # Farenheit to Celsius conversions for every raw byte value.  Setpoints
+    # are sent either as whole degrees or as degrees * 2.
+    F_TO_C = tuple((i - 32) * 5 / 9 for i in range(256))
+    HALF_F_TO_C = tuple((i / 2 - 32) * 5 / 9 for i in range(256))
+
+    # Decoded get_status status flag for each value of the low 5 bits.
+    # Entries are (Status, energy, units, hold).  Bit 0 is cooling and bit 1
+    # is heating (cooling wins if both are set), bit 2 is energy saving,
+    # bit 3 is the units, and bit 4 is hold.
+    _STATUS_TABLE = tuple(
+        (status, bool(flag & 0x04), flag >> 3 & 1, bool(flag & 0x10))
+        for flag, status in zip(range(32), (Status.OFF, Status.COOLING,
+                                            Status.HEATING,
+                                            Status.COOLING) * 8))
+
     def __init__(self, protocol, modem, address, name=None, config_extra=None):
         """Constructor
 
@@ -118,40 +162,76 @@ class Thermostat(Base):
         # This handler stays active for all time - it never ends.
         protocol.add_handler(handler.ThermostatCmd(self))
 
-        # Defined controller groups and the handlers for them
-        self.group_map = {
-            self.Groups.COOLING.value: self.handle_message,
-            self.Groups.HEATING.value: self.handle_message,
-            self.Groups.HUMID_HIGH.value: self.handle_message,
-            self.Groups.HUMID_LOW.value: self.handle_message,
-            self.Groups.BROADCAST.value: self.handle_message,
-            self.Groups.COOLING.value: self.handle_message,
-            self.Groups.COOLING.value: self.handle_message
-            }
+        # Defined controller groups and the handlers for them.  pair() links
+        # the modem to each of these groups.
+        self.group_map = {group: self.handle_message
+                          for group in Thermostat._GROUP_VALUES}
+
+        # Last value emitted for each signal.  See emit_if_changed().
+        self._last_emit = {}
+
+        # Cached units value and the db it was read from.  See units.
+        self._units = Thermostat.FARENHEIT
+        self._units_db = None
 
     @property
     def units(self):
         """Returns the units from the saved metadata
+
+        The value is read from the db once and cached.  The cache is
+        refreshed if the db object is replaced (i.e. when it's loaded from
+        disk).
         """
-        meta = self.db.get_meta('thermostat')
-        ret = Thermostat.FARENHEIT
-        if isinstance(meta, dict) and 'units' in meta:
-            ret = meta['units']
-        return ret
+        if self._units_db is not self.db:
+            meta = self.db.get_meta('thermostat')
+            units = Thermostat.FARENHEIT
+            if isinstance(meta, dict) and 'units' in meta:
+                units = meta['units']
+            self._units = units
+            self._units_db = self.db
+        return self._units
 
     @units.setter
     def units(self, val):
         """Saves units to the database metadata
 
+        This is called for every status message so the database is only
+        written if the units have changed.
+
         Args:
           val:    Either FARENHEIT or CELSIUS
         """
-        meta = {'units': val}
-        if val in [Thermostat.FARENHEIT, Thermostat.CELSIUS]:
-            self.db.set_meta('thermostat', meta)
-        else:
+        if val not in [Thermostat.FARENHEIT, Thermostat.CELSIUS]:
             LOG.error("Bad value %s, for units on Thermostat %s.", val,
                       self.addr)
+            return
+
+        if val == self.units:
+            return
+
+        self.db.set_meta('thermostat', {'units': val})
+        self._units = val
+        self._units_db = self.db
+
+    #-----------------------------------------------------------------------
+    def emit_if_changed(self, signal, value):
+        """Emit a signal only if the value changed since the last emit.
+
+        Status polls and the thermostat direct messages usually repeat the
+        current values.  Skipping the repeats avoids publishing identical
+        MQTT messages.  All of the thermostat signals should be emitted
+        through this so the saved values stay correct.
+
+        Args:
+          signal (Signal):  The signal to emit.
+          value:  The value to emit as signal.emit(self, value).
+        """
+        # Compare the type as well since some signals are emitted with
+        # different IntEnum classes that can have equal values.
+        last = (type(value), value)
+        if self._last_emit.get(signal) != last:
+            self._last_emit[signal] = last
+            signal.emit(self, value)
 
     #-----------------------------------------------------------------------
     def pair(self, on_done=None):
@@ -196,8 +276,13 @@ class Thermostat(Base):
           seq (CommandSeq): The command sequence to add the command to.
           force (bool):  If true, will force a refresh of the device database
                 even if the delta value matches as well as a re-query of the
-                device model information even if it is already known.
+                device model information even if it is already known.  This
+                also clears the last emitted values so get_status() will
+                emit every signal again.
         """
+        if force:
+            self._last_emit.clear()
+
         seq.add(self.get_status)
         super().addRefreshData(seq, force=force)
 
@@ -207,7 +292,9 @@ class Thermostat(Base):
 
         Gets the mode state, current temp, heating/cooling state, fan mode,
         cool setpoint, heat setpoint, and ambient humidity.  Will then emit
-        all necessary signal_* events to cause mqtt messages to be sent
+        the signal_* events for any values that changed since they were last
+        emitted (see emit_if_changed()).  Run 'refresh' with force=True to
+        emit every value again.
 
         Also receives the units (C or F) selected on the thermostat which is
         important for understanding the ambient temp and set point.  If you see
@@ -218,7 +305,7 @@ class Thermostat(Base):
                    completed.  Signature is: on_done(success, msg, data)
         """
         msg = Msg.OutExtended.direct(self.addr, 0x2e, 0x02,
-                                     bytes([0x00] * 14), crc_type="CRC")
+                                     _ZERO14, crc_type="CRC")
         msg_handler = handler.ExtendedCmdResponse(msg, self.handle_status,
                                                   on_done, num_retry=3)
         self.send(msg, msg_handler)
@@ -229,18 +316,22 @@ class Thermostat(Base):
 
         Gets the mode state, current temp, heating/cooling state, fan mode,
         cool setpoint, heat setpoint, and ambient humidity.  Will then emit
-        all necessary signal_* events to cause mqtt messages to be sent
+        the signal_* events for any values that changed since they were last
+        emitted.
 
         Args:
           msg:   (InpStandard) Broadcast message from the device.
         """
         on_done = util.make_callback(on_done)
+        data = msg.data
+        emit = self.emit_if_changed
 
         # The response contains the following data payload
         # D11 - Status Flag.  Processed first, because we need to know Units
         # to calculate some of this.
-        status_flag = int.from_bytes(msg.data[10:11], byteorder='big')
+        status_flag = data[10]
         self.process_status_flag(status_flag)
+        is_f = self.units == Thermostat.FARENHEIT
 
         # D2 - Day
         # D3 - Hour
@@ -248,39 +339,38 @@ class Thermostat(Base):
         # D5 - Second
 
         # D6 - Sys Mode*16 + Fanmode
-        sys_byte = int.from_bytes(msg.data[5:6], byteorder='big')
+        sys_byte = data[5]
         # Fan first bit only
         fan_nibble = sys_byte & 0b1
         self.set_fan_mode_state(fan_nibble)
         # Mode
         mode_nibble = sys_byte >> 4
-        try:
-            hvac_mode = Thermostat.Mode(mode_nibble)
-        except ValueError:
-            LOG.exception("Unknown mode status state %s.", mode_nibble)
+        hvac_mode = Thermostat._MODE_BY_VAL.get(mode_nibble)
+        if hvac_mode is None:
+            LOG.error("Unknown mode status state %s.", mode_nibble)
         else:
-            self.signal_mode_change.emit(self, hvac_mode)
+            emit(self.signal_mode_change, hvac_mode)
 
         # D7 - Cool Set Point in the Units specified on the device
-        cool_sp = int.from_bytes(msg.data[6:7], byteorder='big')
-        if self.units == Thermostat.FARENHEIT:
-            cool_sp = (cool_sp - 32) * 5 / 9
-        self.signal_cool_sp_change.emit(self, cool_sp)
+        cool_sp = data[6]
+        if is_f:
+            cool_sp = Thermostat.F_TO_C[cool_sp]
+        emit(self.signal_cool_sp_change, cool_sp)
 
         # D8 - Humidity
-        humid = int.from_bytes(msg.data[7:8], byteorder='big')
-        self.signal_ambient_humid_change.emit(self, humid)
+        humid = data[7]
+        emit(self.signal_ambient_humid_change, humid)
 
         # D9 - Temp high byte - Celsius *10
         # D10 - Temp low byte - Celsius *10
-        temp_c = int.from_bytes(msg.data[8:10], byteorder='big') / 10
-        self.signal_ambient_temp_change.emit(self, temp_c)
+        temp_c = (data[8] << 8 | data[9]) / 10
+        emit(self.signal_ambient_temp_change, temp_c)
 
         # D12 - Heat Set Point in the Units specified on the device
-        heat_sp = int.from_bytes(msg.data[11:12], byteorder='big')
-        if self.units == Thermostat.FARENHEIT:
-            heat_sp = (heat_sp - 32) * 5 / 9
-        self.signal_heat_sp_change.emit(self, heat_sp)
+        heat_sp = data[11]
+        if is_f:
+            heat_sp = Thermostat.F_TO_C[heat_sp]
+        emit(self.signal_heat_sp_change, heat_sp)
 
         on_done(True, "Status recevied", None)
 
@@ -298,25 +388,18 @@ class Thermostat(Base):
         """
         # I have not figured out what the last three bits are.  Program lock
         # is likely one of them.  As is 12/24 hour, perhaps button beep,
-        # button lock, or backlight?  This also seems like a messy way to
-        # handle this, is there a better way?
-        cooling = flag & 1
-        heating = flag >> 1 & 1
-        energy = flag >> 2 & 1
-        self.units = flag >> 3 & 1
-        hold = flag >> 4 & 1
+        # button lock, or backlight?  The known bits are decoded by
+        # _STATUS_TABLE.
+        status, energy, units, hold = Thermostat._STATUS_TABLE[flag & 0x1F]
+        self.units = units
 
         # Signal status change
-        status = Thermostat.Status.OFF
-        if cooling:
-            status = Thermostat.Status.COOLING
-        elif heating:
-            status = Thermostat.Status.HEATING
-        self.signal_status_change.emit(self, status)
+        emit = self.emit_if_changed
+        emit(self.signal_status_change, status)
 
         # Signal hold state and energy.
-        self.signal_hold_change.emit(self, bool(hold))
-        self.signal_energy_change.emit(self, bool(energy))
+        emit(self.signal_hold_change, hold)
+        emit(self.signal_energy_change, energy)
 
     #-----------------------------------------------------------------------
     def set_fan_mode_state(self, mode):
@@ -327,12 +410,11 @@ class Thermostat(Base):
         Args:
           mode (int):  An int which matches the options in Thermostat.Fanmode
         """
-        try:
-            fan_mode = Thermostat.Fan(mode)
-        except ValueError:
-            LOG.exception("Unknown fan mode state %s.", mode)
+        fan_mode = Thermostat._FAN_BY_VAL.get(mode)
+        if fan_mode is None:
+            LOG.error("Unknown fan mode state %s.", mode)
         else:
-            self.signal_fan_mode_change.emit(self, fan_mode)
+            self.emit_if_changed(self.signal_fan_mode_change, fan_mode)
 
     #-----------------------------------------------------------------------
     def get_humidity_setpoints(self, on_done=None):
@@ -347,7 +429,7 @@ class Thermostat(Base):
                    completed.  Signature is: on_done(success, msg, data)
         """
         msg = Msg.OutExtended.direct(
-            self.addr, 0x2e, 0x00, bytes([0x00] * 2 + [0x01] + [0x00] * 11),
+            self.addr, 0x2e, 0x00, _HUMID_REQ_PAYLOAD,
             crc_type="CRC")
         msg_handler = handler.ExtendedCmdResponse(
             msg, self.handle_humidity_setpoints, on_done, num_retry=3)
@@ -393,7 +475,7 @@ class Thermostat(Base):
                    completed.  Signature is: on_done(success, msg, data)
         """
         msg = Msg.OutExtended.direct(self.addr, 0x2e, 0x00,
-                                     bytes([0x00] + [0x08] + [0x00] * 12))
+                                     _ENABLE_BCAST_PAYLOAD)
         callback = self.generic_ack_callback("Thermostate broadcast enabled")
         msg_handler = handler.StandardCmd(msg, callback, on_done, num_retry=3)
         self.send(msg, msg_handler)
@@ -411,31 +493,62 @@ class Thermostat(Base):
         Args:
           msg (InpStandard): Broadcast message from the device.
         """
-        if msg.cmd1 in [Msg.CmdType.ON, Msg.CmdType.OFF]:
+        if msg.cmd1 in Thermostat._BCAST_CMDS:
             LOG.info("Thermostat %s broadcast %s grp: %s", self.addr, msg.cmd1,
                      msg.group)
 
-            condition = Thermostat.Groups(msg.group)
+            condition = Thermostat._GROUP_BY_VAL.get(msg.group)
+            if condition is None:
+                LOG.error("Thermostat %s unknown broadcast group %s",
+                          self.addr, msg.group)
+                return
 
             LOG.info("Thermostat %s signaling condition %s", self.addr,
                      condition)
 
             # Only handling Heating and Cooling, not humidifying yet
-            if condition in [Thermostat.Groups.HEATING,
-                             Thermostat.Groups.COOLING]:
-                if msg.cmd1 == 0x13:
-                    status = Thermostat.Status.OFF
-                elif condition is Thermostat.Groups.HEATING:
-                    status = Thermostat.Status.HEATING
-                else:
-                    status = Thermostat.Status.COOLING
-
-                self.signal_status_change.emit(self, status)
+            status = Thermostat._BCAST_STATUS.get((condition, msg.cmd1))
+            if status is not None:
+                self.emit_if_changed(self.signal_status_change, status)
 
         # As long as there is no errors (which return above), call
         # handle_broadcast for any device that we're the controller of.
         self.update_linked_devices(msg)
 
+    #-----------------------------------------------------------------------
+    def _send_simple_cmd(self, cmd1, cmd2, ack_handler):
+        """Send a thermostat command with an all zero extended payload.
+
+        Args:
+          cmd1 (int):  The command code.
+          cmd2 (int):  The command value.
+          ack_handler:  The method to call with the ack from the device.
+        """
+        msg = Msg.OutExtended.direct(self.addr, cmd1, cmd2, _ZERO14)
+        msg_handler = handler.StandardCmd(msg, ack_handler, None, num_retry=3)
+        self.send(msg, msg_handler)
+
+    #-----------------------------------------------------------------------
+    def _encode_sp(self, temp_c):
+        """Convert a setpoint to the value to send to the thermostat.
+
+        The thermostat takes setpoints in its own units * 2.
+
+        Args:
+          temp_c:   temperature in celsius
+
+        Returns:
+          int: The setpoint command value.
+        """
+        # Convert to proper units
+        temp = temp_c
+        if self.units == Thermostat.FARENHEIT:
+            temp = temp_c * _C_TO_F_SLOPE + 32
+
+        # Limit the setpoint to the 0-127 degree range (0-254 encoded).
+        # Clamp before int() so non-finite inputs are limited too.
+        return int(max(0, min(127, temp)) * 2)
+
     #-----------------------------------------------------------------------
     def mode_command(self, mode):
         """Command the Thermostat to change modes.
@@ -446,11 +559,7 @@ class Thermostat(Base):
           mode (Thermostat.ModeCommands):  The mode to change.
         """
         # Send the command to the thermostat
-        msg = Msg.OutExtended.direct(self.addr, 0x6b, mode.value,
-                                     bytes([0x00] * 14))
-        msg_handler = handler.StandardCmd(msg, self.handle_mode_command,
-                                          None, num_retry=3)
-        self.send(msg, msg_handler)
+        self._send_simple_cmd(0x6b, mode.value, self.handle_mode_command)
 
     #-----------------------------------------------------------------------
     def handle_mode_command(self, msg, on_done=None):
@@ -469,8 +578,8 @@ class Thermostat(Base):
         on_done = util.make_callback(on_done)
 
         if msg.cmd1 == 0x6b:
-            self.signal_mode_change.emit(self,
-                                         Thermostat.ModeCommands(msg.cmd2))
+            self.emit_if_changed(self.signal_mode_change,
+                                 Thermostat.ModeCommands(msg.cmd2))
             on_done(True, "Thermostat recevied mode command", None)
 
         else:
@@ -488,11 +597,7 @@ class Thermostat(Base):
           fan (Thermostat.FanCommands): The fan command to send.
         """
         # Send the command to the thermostat
-        msg = Msg.OutExtended.direct(self.addr, 0x6b, fan.value,
-                                     bytes([0x00] * 14))
-        msg_handler = handler.StandardCmd(msg, self.handle_fan_command,
-                                          None, num_retry=3)
-        self.send(msg, msg_handler)
+        self._send_simple_cmd(0x6b, fan.value, self.handle_fan_command)
 
     #-----------------------------------------------------------------------
     def handle_fan_command(self, msg, on_done=None):
@@ -511,8 +616,8 @@ class Thermostat(Base):
         on_done = util.make_callback(on_done)
 
         if msg.cmd1 == 0x6b:
-            self.signal_fan_mode_change.emit(self,
-                                             Thermostat.FanCommands(msg.cmd2))
+            self.emit_if_changed(self.signal_fan_mode_change,
+                                 Thermostat.FanCommands(msg.cmd2))
             on_done(True, "Thermostat recevied fan mode command", None)
 
         else:
@@ -529,21 +634,8 @@ class Thermostat(Base):
         Args:
           temp_c:   temperature in celsius
         """
-        # Convert to proper units
-        temp = temp_c
-        if self.units == Thermostat.FARENHEIT:
-            temp = (temp_c * 9.0 / 5.0) + 32
-
-        # Limit temp range
-        temp = 0 if temp < 0 else temp
-        temp = 127 if temp > 127 else temp
-
-        # Send the command to the thermostat in units on thermo * 2
-        msg = Msg.OutExtended.direct(self.addr, 0x6d, int(temp * 2),
-                                     bytes([0x00] * 14))
-        msg_handler = handler.StandardCmd(msg, self.handle_heat_sp_command,
-                                          None, num_retry=3)
-        self.send(msg, msg_handler)
+        self._send_simple_cmd(0x6d, self._encode_sp(temp_c),
+                              self.handle_heat_sp_command)
 
     #-----------------------------------------------------------------------
     def handle_heat_sp_command(self, msg, on_done=None):
@@ -562,11 +654,12 @@ class Thermostat(Base):
         on_done = util.make_callback(on_done)
 
         if msg.cmd1 == 0x6d:
-            heat_sp = msg.cmd2 / 2
             if self.units == Thermostat.FARENHEIT:
-                heat_sp = (heat_sp - 32) * 5 / 9
+                heat_sp = Thermostat.HALF_F_TO_C[msg.cmd2]
+            else:
+                heat_sp = msg.cmd2 / 2
 
-            self.signal_heat_sp_change.emit(self, heat_sp)
+            self.emit_if_changed(self.signal_heat_sp_change, heat_sp)
             on_done(True, "Thermostat recevied heat setpoint command", None)
 
         else:
@@ -583,21 +676,8 @@ class Thermostat(Base):
         Args:
           temp_c:   temperature in celsius
         """
-        # Convert to proper units
-        temp = temp_c
-        if self.units == Thermostat.FARENHEIT:
-            temp = (temp_c * 9 / 5) + 32
-
-        # Limit temp range
-        temp = 0 if temp < 0 else temp
-        temp = 127 if temp > 127 else temp
-
-        # Send the command to the thermostat in units on thermo * 2
-        msg = Msg.OutExtended.direct(self.addr, 0x6c, int(temp * 2),
-                                     bytes([0x00] * 14))
-        msg_handler = handler.StandardCmd(msg, self.handle_cool_sp_command,
-                                          None, num_retry=3)
-        self.send(msg, msg_handler)
+        self._send_simple_cmd(0x6c, self._encode_sp(temp_c),
+                              self.handle_cool_sp_command)
 
     #-----------------------------------------------------------------------
     def handle_cool_sp_command(self, msg, on_done=None):
@@ -616,11 +696,12 @@ class Thermostat(Base):
         on_done = util.make_callback(on_done)
 
         if msg.cmd1 == 0x6c:
-            cool_sp = msg.cmd2 / 2
             if self.units == Thermostat.FARENHEIT:
-                cool_sp = (cool_sp - 32) * 5 / 9
+                cool_sp = Thermostat.HALF_F_TO_C[msg.cmd2]
+            else:
+                cool_sp = msg.cmd2 / 2
 
-            self.signal_cool_sp_change.emit(self, cool_sp)
+            self.emit_if_changed(self.signal_cool_sp_change, cool_sp)
             on_done(True, "Thermostat recevied cool setpoint command", None)
 
         else:
@@ -34,6 +34,10 @@ class ThermostatCmd(Base):
         AUTO = 0x03
         PROGRAM = 0x04
 
+    # Value to Mode member map so unknown values return None from get()
+    # instead of raising like the enum constructor.
+    _MODE_BY_VAL = {member.value: member for member in Mode}
+
     def __init__(self, device):
         """Constructor
 
@@ -85,15 +89,18 @@ class ThermostatCmd(Base):
         # Pull out and process the commands that this handler handles
         if msg.cmd1 == STATUS_TEMP:
             # Temperature is 2x presumably for resolution
-            temp = int(msg.cmd2) / 2
             if self.device.units == self.device.FARENHEIT:
-                temp = (temp - 32) * 5 / 9
-            self.device.signal_ambient_temp_change.emit(self.device, temp)
+                temp = self.device.HALF_F_TO_C[msg.cmd2]
+            else:
+                temp = int(msg.cmd2) / 2
+            self.device.emit_if_changed(
+                self.device.signal_ambient_temp_change, temp
+            )
             return Msg.CONTINUE
 
         elif msg.cmd1 == STATUS_HUMID:
-            self.device.signal_ambient_humid_change.emit(
-                self.device, int(msg.cmd2)
+            self.device.emit_if_changed(
+                self.device.signal_ambient_humid_change, int(msg.cmd2)
             )
             return Msg.CONTINUE
 
@@ -101,33 +108,39 @@ class ThermostatCmd(Base):
             fan_nibble = int(msg.cmd2) >> 4
             mode_nibble = int(msg.cmd2) & 0b00001111
             self.device.set_fan_mode_state(fan_nibble)
-            try:
-                # Convert from the handler mode to the ThermostatMode since
-                # the integer codes are different.  We can use the enum names
-                # to map between the enums even though they have different
-                # modes.  This way the signal always emits Thermostat.Mode
-                # flags.
-                local_mode = ThermostatCmd.Mode(mode_nibble)
-                hvac_mode = self.device.Mode[local_mode.name]
-            except ValueError:
-                LOG.exception("Unknown mode broadcast state %s.", mode_nibble)
+            # Convert from the handler mode to the ThermostatMode since the
+            # integer codes are different.  We can use the enum names to map
+            # between the enums even though they have different modes.  This
+            # way the signal always emits Thermostat.Mode flags.
+            local_mode = ThermostatCmd._MODE_BY_VAL.get(mode_nibble)
+            if local_mode is None:
+                LOG.error("Unknown mode broadcast state %s.", mode_nibble)
             else:
-                self.device.signal_mode_change.emit(self.device, hvac_mode)
+                hvac_mode = self.device.Mode[local_mode.name]
+                self.device.emit_if_changed(
+                    self.device.signal_mode_change, hvac_mode
+                )
 
             return Msg.CONTINUE
 
         elif msg.cmd1 == STATUS_COOL_SP:
-            cool_sp = int(msg.cmd2)
             if self.device.units == self.device.FARENHEIT:
-                cool_sp = (cool_sp - 32) * 5 / 9
-            self.device.signal_cool_sp_change.emit(self.device, cool_sp)
+                cool_sp = self.device.F_TO_C[msg.cmd2]
+            else:
+                cool_sp = int(msg.cmd2)
+            self.device.emit_if_changed(
+                self.device.signal_cool_sp_change, cool_sp
+            )
             return Msg.CONTINUE
 
         elif msg.cmd1 == STATUS_HEAT_SP:
-            heat_sp = int(msg.cmd2)
             if self.device.units == self.device.FARENHEIT:
-                heat_sp = (heat_sp - 32) * 5 / 9
-            self.device.signal_heat_sp_change.emit(self.device, heat_sp)
+                heat_sp = self.device.F_TO_C[msg.cmd2]
+            else:
+                heat_sp = int(msg.cmd2)
+            self.device.emit_if_changed(
+                self.device.signal_heat_sp_change, heat_sp
+            )
             return Msg.CONTINUE
 
         # Different message flags than we exepcted.
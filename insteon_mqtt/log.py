@@ -170,3 +170,8 @@ class CallbackHandler(logging.Handler):
         self.callback(record)
 
 #===========================================================================
+
+
+# Bound level check of the library logger.  Frequently called code can use
+# this to skip building log message arguments when the level is disabled.
+is_enabled_for = get_logger().isEnabledFor
@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 
+import os
+import warnings
 import setuptools
 
 readme = open('README.md').read()
@@ -8,6 +10,22 @@ requirements = open("requirements.txt").readlines()
 
 test_requirements = open("requirements-test.txt").readlines()
 
+# Optionally compile the command sequence and motion sensor modules with
+# Cython by setting INSTEON_MQTT_CYTHON=1 when installing.  This requires
+# Cython to be importable by the build (i.e. pip --no-build-isolation).  The
+# pure python modules are used otherwise.
+ext_modules = []
+if os.environ.get("INSTEON_MQTT_CYTHON") == "1":
+    try:
+        from Cython.Build import cythonize
+    except ImportError:
+        warnings.warn("INSTEON_MQTT_CYTHON is set but Cython can't be "
+                      "imported.  Installing the pure python modules.")
+    else:
+        ext_modules = cythonize(["insteon_mqtt/CommandSeq.py",
+                                 "insteon_mqtt/device/Motion.py"],
+                                language_level=3, build_dir="build")
+
 setuptools.setup(
     name = 'insteon-mqtt',
     version = '1.1.3',
@@ -23,6 +41,7 @@ setuptools.setup(
         "": ["data/*.yaml"],
     },
     install_requires = requirements,
+    ext_modules = ext_modules,
     license = "GNU General Public License v3",
     classifiers = [
         'Development Status :: 4 - Beta',
@@ -4,6 +4,7 @@
 #
 # pylint: disable=W0621,W0201,W0212
 #===========================================================================
+import time
 from unittest import mock
 from unittest.mock import call
 import pytest
@@ -91,6 +92,15 @@ class Test_Base_Config():
         test_device.battery_voltage_time = 200
         assert test_device.battery_voltage_time == 200
 
+    def test_meta_reload(self, test_device):
+        test_device.battery_voltage_time = 100
+        assert test_device.db.get_meta('Motion') == {'battery_voltage_time': 100}
+        # Replacing the db (like load_db does) should drop the cached meta
+        data = test_device.db.to_json()
+        data['meta'] = {'Motion': {'battery_voltage_time': 300}}
+        test_device.db = IM.db.Device.from_json(data, None, test_device)
+        assert test_device.battery_voltage_time == 300
+
     def test_low_voltage(self, test_device):
         # set as a 2842 model
         test_device.db.set_info(0x10, 0x01, 0x00)
@@ -233,6 +243,25 @@ class Test_Base_Config():
         sent = test_device.protocol.sent
         assert len(sent) == 0
 
+    def test_auto_check_battery_gate(self, test_device):
+        # set as a 2842 model with a recent voltage report
+        test_device.db.set_info(0x10, 0x01, 0x00)
+        last = time.time()
+        test_device.battery_voltage_time = last
+        def on_done(*args):
+            pass
+        # Mark awake so messages get sent to protocol.  This also runs the
+        # battery check which shouldn't send anything yet.
+        test_device.awake(on_done)
+        assert len(test_device.protocol.sent) == 0
+        assert test_device._next_battery_check == last + Motion.BATTERY_TIME
+        # Once the time is reached, the request is made
+        now = test_device._next_battery_check
+        with mock.patch.object(time, 'time', return_value=now):
+            test_device.auto_check_battery()
+        assert test_device._battery_request_time == now
+        assert test_device._next_battery_check == now + 300
+
     def test_set_flags_extended(self, test_device):
         def on_done(*args):
             pass
@@ -245,6 +274,19 @@ class Test_Base_Config():
         assert test_device.protocol.sent[0].msg.cmd2 == 0x00
         # already test extended flags above
 
+    def test_set_flags_all(self, test_device):
+        def on_done(*args):
+            pass
+        # Mark awake so messages get sent to protocol
+        test_device.awake(on_done)
+        test_device.protocol.clear()
+        test_device.set_flags(None, led_on=1, night_only=0, on_only=0)
+        # All flags are known so no ext flag request should be sent
+        assert len(test_device.protocol.sent) == 1
+        assert test_device.protocol.sent[0].msg.cmd1 == Msg.CmdType.EXTENDED_SET_GET
+        assert test_device.protocol.sent[0].msg.data[1] == 0x05  # Set flags
+        assert test_device.protocol.sent[0].msg.data[2] == 0x0E
+
     def test_change_flags_led_on(self, test_device):
         test_device.led_on = 0
         test_device.night_only = 1
@@ -330,6 +330,69 @@ class Test_Thermostat:
             else:
                 mocked.assert_not_called()
 
+    def test_group_map(self, test_device):
+        # pair() links the modem to each of these groups in order
+        assert list(test_device.group_map) == [0x01, 0x02, 0x03, 0x04, 0xEF]
+
+    def test_emit_if_changed(self, test_device):
+        humid = test_device.signal_ambient_humid_change
+        mode = test_device.signal_mode_change
+        with mock.patch.object(IM.Signal, 'emit') as mocked:
+            test_device.emit_if_changed(humid, 50)
+            test_device.emit_if_changed(humid, 50)
+            assert mocked.call_count == 1
+            test_device.emit_if_changed(humid, 51)
+            assert mocked.call_count == 2
+            # Equal IntEnum values from different enums are both sent.
+            test_device.emit_if_changed(mode, Thermo.Mode.PROGRAM)
+            test_device.emit_if_changed(mode, Thermo.ModeCommands.HEAT)
+            assert mocked.call_count == 4
+
+    def test_force_refresh_emits(self, test_device):
+        humid = test_device.signal_ambient_humid_change
+        with mock.patch.object(IM.Signal, 'emit') as mocked:
+            test_device.emit_if_changed(humid, 50)
+            seq = IM.CommandSeq(test_device, "Done", None)
+            test_device.addRefreshData(seq)
+            test_device.emit_if_changed(humid, 50)
+            assert mocked.call_count == 1
+            # A forced refresh publishes all of the values again.
+            test_device.addRefreshData(seq, force=True)
+            test_device.emit_if_changed(humid, 50)
+            assert mocked.call_count == 2
+
+    def test_units_reload(self, test_device):
+        assert test_device.units == Thermo.FARENHEIT
+        test_device.units = Thermo.CELSIUS
+        assert test_device.units == Thermo.CELSIUS
+        # Replacing the db (like load_db does) should drop the cached units
+        data = test_device.db.to_json()
+        data['meta'] = {'thermostat': {'units': Thermo.FARENHEIT}}
+        test_device.db = IM.db.Device.from_json(data, None, test_device)
+        assert test_device.units == Thermo.FARENHEIT
+
+    def test_units_unchanged(self, test_device):
+        test_device.units = Thermo.CELSIUS
+        with mock.patch.object(test_device.db, 'set_meta') as mocked:
+            test_device.units = Thermo.CELSIUS
+            mocked.assert_not_called()
+            test_device.units = Thermo.FARENHEIT
+            mocked.assert_called_once_with('thermostat',
+                                           {'units': Thermo.FARENHEIT})
+
+    def test_encode_sp(self, test_device):
+        test_device.units = Thermo.CELSIUS
+        assert test_device._encode_sp(25) == 50
+        assert test_device._encode_sp(22.6) == 45
+        # Out of range setpoints are clamped to 0-127 degrees.
+        assert test_device._encode_sp(-5) == 0
+        assert test_device._encode_sp(200) == 254
+        assert test_device._encode_sp(float("inf")) == 254
+        assert test_device._encode_sp(float("-inf")) == 0
+        test_device.units = Thermo.FARENHEIT
+        assert test_device._encode_sp(25) == 154
+        assert test_device._encode_sp(60) == 254
+
     def test_units_bad(self, tmpdir, caplog):
         protocol = MockProto()
         modem = MockModem(tmpdir)
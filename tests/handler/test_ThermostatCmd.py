@@ -0,0 +1,63 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/handler/ThermostatCmd.py
+#
+#===========================================================================
+from unittest import mock
+import insteon_mqtt as IM
+import insteon_mqtt.message as Msg
+import helpers as H
+
+
+class Test_ThermostatCmd:
+    def test_mode(self, tmpdir, caplog):
+        protocol = H.main.MockProtocol()
+        modem = H.main.MockModem(tmpdir)
+        addr = IM.Address(0x01, 0x02, 0x03)
+        device = IM.device.Thermostat(protocol, modem, addr)
+        modem.add(device)
+        handler = IM.handler.ThermostatCmd(device)
+
+        flags = Msg.Flags(Msg.Flags.Type.DIRECT, False)
+        with mock.patch.object(IM.Signal, 'emit') as mocked:
+            # Fan on, handler mode 0x02 is cool
+            msg = Msg.InpStandard(addr, modem.addr, flags, 0x70, 0x12)
+            r = handler.msg_received(protocol, msg)
+            assert r == Msg.CONTINUE
+            mocked.assert_has_calls([
+                mock.call(device, device.Fan.ON),
+                mock.call(device, device.Mode.COOL)])
+
+            # Unknown mode is logged and not emitted.
+            mocked.reset_mock()
+            msg = Msg.InpStandard(addr, modem.addr, flags, 0x70, 0x07)
+            r = handler.msg_received(protocol, msg)
+            assert r == Msg.CONTINUE
+            mocked.assert_called_once_with(device, device.Fan.AUTO)
+            assert "Unknown mode broadcast state 7" in caplog.text
+
+    def test_farenheit(self, tmpdir):
+        protocol = H.main.MockProtocol()
+        modem = H.main.MockModem(tmpdir)
+        addr = IM.Address(0x01, 0x02, 0x03)
+        device = IM.device.Thermostat(protocol, modem, addr)
+        modem.add(device)
+        device.units = device.FARENHEIT
+        handler = IM.handler.ThermostatCmd(device)
+
+        flags = Msg.Flags(Msg.Flags.Type.DIRECT, False)
+        with mock.patch.object(IM.Signal, 'emit') as mocked:
+            # Ambient temp is sent as degrees * 2.
+            msg = Msg.InpStandard(addr, modem.addr, flags, 0x6e, 131)
+            handler.msg_received(protocol, msg)
+            mocked.assert_called_once_with(device, (131 / 2 - 32) * 5 / 9)
+
+            mocked.reset_mock()
+            msg = Msg.InpStandard(addr, modem.addr, flags, 0x71, 65)
+            handler.msg_received(protocol, msg)
+            mocked.assert_called_once_with(device, (65 - 32) * 5 / 9)
+
+            mocked.reset_mock()
+            msg = Msg.InpStandard(addr, modem.addr, flags, 0x72, 68)
+            handler.msg_received(protocol, msg)
+            mocked.assert_called_once_with(device, (68 - 32) * 5 / 9)
@@ -0,0 +1,162 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/CommandSeq.py
+#
+#===========================================================================
+import sys
+import insteon_mqtt as IM
+
+
+class Done:
+    def __init__(self):
+        self.results = []
+
+    def __call__(self, success, msg, data):
+        self.results.append((success, msg, data))
+
+#===========================================================================
+
+
+def test_sync_calls():
+    order = []
+
+    def step(value, on_done):
+        order.append(value)
+        on_done(True, None, value)
+
+    done = Done()
+    seq = IM.CommandSeq(None, "Complete", done)
+    for i in range(5):
+        seq.add(step, i)
+
+    seq.run()
+    assert order == [0, 1, 2, 3, 4]
+    assert done.results == [(True, "Complete", 4)]
+    assert len(seq.calls) == 0
+
+#===========================================================================
+
+
+def test_kwargs():
+    calls = []
+
+    def step(value, on_done, extra=None):
+        calls.append((value, extra))
+        on_done(True, None, None)
+
+    done = Done()
+    seq = IM.CommandSeq(None, "Complete", done)
+    seq.add(step, 0)
+    seq.add(step, 1, extra="a")
+    # on_done is always replaced by the sequence callback.
+    seq.add(step, 2, extra="b", on_done=None)
+
+    seq.run()
+    assert calls == [(0, None), (1, "a"), (2, "b")]
+    assert done.results == [(True, "Complete", None)]
+
+#===========================================================================
+
+
+def test_long_sync_sequence():
+    # Synchronous commands must not recurse so the sequence length isn't
+    # limited by the stack depth.
+    count = []
+
+    def step(on_done):
+        count.append(1)
+        on_done(True, None, None)
+
+    done = Done()
+    seq = IM.CommandSeq(None, "Complete", done)
+    for _ in range(sys.getrecursionlimit() * 2):
+        seq.add(step)
+
+    seq.run()
+    assert len(count) == sys.getrecursionlimit() * 2
+    assert done.results == [(True, "Complete", None)]
+
+#===========================================================================
+
+
+def test_async_calls():
+    pending = []
+
+    def step(value, on_done):
+        pending.append((value, on_done))
+
+    done = Done()
+    seq = IM.CommandSeq(None, "Complete", done)
+    seq.add(step, 0)
+    seq.add(step, 1)
+
+    seq.run()
+    assert len(pending) == 1
+
+    # Finish the first command from "the network".
+    value, on_done = pending.pop(0)
+    assert value == 0
+    on_done(True, None, None)
+    assert len(pending) == 1
+    assert done.results == []
+
+    value, on_done = pending.pop(0)
+    assert value == 1
+    on_done(True, None, None)
+    assert done.results == [(True, "Complete", None)]
+
+#===========================================================================
+
+
+def test_error_stop():
+    order = []
+
+    def step(value, on_done):
+        order.append(value)
+        on_done(value != 1, "Failed" if value == 1 else None, None)
+
+    done = Done()
+    seq = IM.CommandSeq(None, "Complete", done)
+    for i in range(3):
+        seq.add(step, i)
+
+    seq.run()
+    assert order == [0, 1]
+    assert done.results == [(False, "Failed", None)]
+
+    order.clear()
+    done = Done()
+    seq = IM.CommandSeq(None, "Complete", done, error_stop=False)
+    for i in range(3):
+        seq.add(step, i)
+
+    seq.run()
+    assert order == [0, 1, 2]
+    assert done.results == [(True, "Complete", None)]
+
+#===========================================================================
+
+
+def test_add_msg():
+    class Device:
+        def __init__(self):
+            self.sent = []
+
+        def send(self, msg, handler):
+            self.sent.append((msg, handler))
+
+    class Handler:
+        on_done = None
+
+    device = Device()
+    done = Done()
+    seq = IM.CommandSeq(device, "Complete", done)
+    handler = Handler()
+    seq.add_msg("msg", handler)
+
+    seq.run()
+    assert device.sent == [("msg", handler)]
+    handler.on_done(True, None, None)
+    assert done.results == [(True, "Complete", None)]
+
+#===========================================================================